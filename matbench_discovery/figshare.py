@@ -116,7 +116,9 @@ def get_file_hash_and_size(
     return md5.hexdigest(), size
 
 
-def upload_file(article_id: int, file_path: str, file_name: str = "") -> int:
+def upload_file(
+    article_id: int, file_path: str, file_name: str = "", md5: str | None = None
+) -> int:
     """Upload a file to Figshare and return the file ID.
 
     Args:
@@ -124,12 +126,17 @@ def upload_file(article_id: int, file_path: str, file_name: str = "") -> int:
         file_path (str): Path to the file to upload.
         file_name (str, optional): Name as it will appear in Figshare. Defaults to the
             file path relative to repo's root dir: file_path.removeprefix(ROOT).
+        md5 (str, optional): MD5 hash of the file if already known, to avoid reading
+            the file twice. Defaults to None, meaning compute it here.
 
     Returns:
         int: The ID of the uploaded file.
     """
     # Initiate new upload
-    md5, size = get_file_hash_and_size(file_path)
+    if md5 is None:
+        md5, size = get_file_hash_and_size(file_path)
+    else:
+        size = os.path.getsize(file_path)
     file_name = file_name or file_path.removeprefix(f"{ROOT}/")
     data = dict(name=file_name, md5=md5, size=size)
     endpoint = f"{BASE_URL}/account/articles/{article_id}/files"
@@ -97,24 +97,28 @@ def hist_classified_stable_vs_hull_dist(
     for facet, df_group in (
         df.groupby(kwargs["facet_col"]) if "facet_col" in kwargs else [(None, df)]
     ):
-        true_pos, false_neg, false_pos, true_neg = classify_stable(
-            df_group[each_true_col],
-            df_group[each_pred_col],
-            stability_threshold=stability_threshold,
+        # work on NumPy arrays to avoid allocating an indexed Series per boolean mask
+        true_pos, false_neg, false_pos, true_neg = (
+            mask.to_numpy()
+            for mask in classify_stable(
+                df_group[each_true_col],
+                df_group[each_pred_col],
+                stability_threshold=stability_threshold,
+            )
         )
 
         # switch between hist of DFT-computed and model-predicted convex hull distance
-        srs_each = df_group[x_col]
-        each_true_pos = srs_each[true_pos]
-        each_true_neg = srs_each[true_neg]
-        each_false_neg = srs_each[false_neg]
-        each_false_pos = srs_each[false_pos]
+        each = df_group[x_col].to_numpy()
+        each_true_pos = each[true_pos]
+        each_true_neg = each[true_neg]
+        each_false_neg = each[false_neg]
+        each_false_pos = each[false_pos]
         # n_true_pos, n_false_pos, n_true_neg, n_false_neg = map(
         #     sum, (true_pos, false_pos, true_neg, false_neg)
         # )
 
         df_group[clf_col] = np.array(clf_labels)[
-            true_pos * 0 + false_neg * 1 + false_pos * 2 + true_neg * 3
+            false_neg * 1 + false_pos * 2 + true_neg * 3
         ]
 
         # calculate histograms for each category
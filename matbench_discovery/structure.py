@@ -1,7 +1,12 @@
 """Perturb atomic coordinates of a pymatgen structure and analyze symmetry."""
 
+from collections import defaultdict
+from collections.abc import Callable
+from typing import Any
+
 import numpy as np
 import pandas as pd
+from joblib import Memory, Parallel, delayed
 from pymatgen.analysis.structure_matcher import StructureMatcher
 from pymatgen.core import Structure
 from pymatviz.enums import Key
@@ -29,15 +34,79 @@ def perturb_structure(struct: Structure, gamma: float = 1.5) -> Structure:
     Returns:
         Structure: Perturbed structure
     """
-    perturbed = struct.copy()
-    for site in perturbed:
-        magnitude = rng.weibull(gamma)
-        vec = rng.normal(3)  # TODO maybe make func recursive to deal with 0-vector
-        vec /= np.linalg.norm(vec)  # unit vector
-        site.coords += vec * magnitude
-        site.to_unit_cell(in_place=True)
+    n_sites = len(struct)
+    magnitudes = rng.weibull(gamma, size=n_sites)
+    vecs = rng.normal(size=(n_sites, 3))
+    vecs /= np.linalg.norm(vecs, axis=1, keepdims=True)  # unit vectors
+
+    cart_coords = struct.cart_coords + vecs * magnitudes[:, None]
+    frac_coords = struct.lattice.get_fractional_coords(cart_coords) % 1
+
+    return Structure(
+        struct.lattice,
+        struct.species_and_occu,
+        frac_coords,
+        charge=struct.charge,
+        site_properties=struct.site_properties,
+        labels=struct.labels,
+        properties=struct.properties,
+    )
+
+
+def _sym_one(
+    struct_key: str,
+    cell: tuple[np.ndarray, np.ndarray, np.ndarray],
+    symprec: float,
+    angle_tolerance: float | None,
+) -> dict[str, str | int | float | list[str] | None]:
+    """Get moyopy symmetry info for a single structure. Defined at module level so
+    joblib can pickle it for worker processes.
+
+    Args:
+        struct_key (str): Material ID of the structure (used in error messages).
+        cell (tuple[np.ndarray, np.ndarray, np.ndarray]): Lattice matrix, fractional
+            coordinates and atomic numbers of the structure.
+        symprec (float): Symmetry precision of moyopy.
+        angle_tolerance (float | None): Angle tolerance of moyopy in radians.
+
+    Returns:
+        dict[str, str | int | float | list[str] | None]: Symmetry info of the
+            structure.
+    """
+    import moyopy
 
-    return perturbed
+    basis, positions, numbers = cell
+    moyo_cell = moyopy.Cell(
+        basis=basis.tolist(), positions=positions.tolist(), numbers=numbers.tolist()
+    )
+
+    sym_data = moyopy.MoyoDataset(
+        moyo_cell, symprec=symprec, angle_tolerance=angle_tolerance
+    )
+
+    if sym_data is None:
+        raise ValueError(
+            f"moyopy symmetry detection returned None for {struct_key}\n"
+            f"{basis=}\n{positions=}\n{numbers=}"
+        )
+
+    # each operation is one rotation + translation pair so all three counts are equal,
+    # no need to copy the rotation and translation arrays into Python just to len()
+    n_sym_ops = sym_data.operations.num_operations
+    hall_symbol_entry = moyopy.HallSymbolEntry(hall_number=sym_data.hall_number)
+
+    return {
+        Key.spg_num: sym_data.number,
+        Key.hall_num: sym_data.hall_number,
+        MbdKey.international_spg_name: sym_data.site_symmetry_symbols,
+        Key.wyckoff_symbols: sym_data.wyckoffs,
+        Key.n_sym_ops: n_sym_ops,
+        Key.n_rot_syms: n_sym_ops,
+        Key.n_trans_syms: n_sym_ops,
+        Key.hall_symbol: hall_symbol_entry.hm_short,
+        Key.symprec: symprec,
+        Key.angle_tolerance: angle_tolerance,
+    }
 
 
 def analyze_symmetry(
@@ -46,6 +115,7 @@ def analyze_symmetry(
     pbar: bool | dict[str, str] = True,
     symprec: float = 1e-2,
     angle_tolerance: float | None = None,
+    n_jobs: int = -1,
 ) -> pd.DataFrame:
     """Analyze symmetry of a dictionary of structures using moyopy.
 
@@ -57,62 +127,168 @@ def analyze_symmetry(
         symprec (float, optional): Symmetry precision of moyopy. Defaults to 1e-2.
         angle_tolerance (float, optional): Angle tolerance of moyopy (in radians unlike
             spglib which uses degrees!). Defaults to None.
+        n_jobs (int, optional): Number of worker processes passed to joblib.Parallel.
+            Defaults to -1 (all cores). Use 1 to run serially in the current process.
 
     Returns:
         pd.DataFrame: DataFrame containing symmetry information for each structure
     """
-    import moyopy
-    from moyopy.interface import MoyoAdapter
+    # convert to plain arrays in the parent process so workers don't need to unpickle
+    # full pymatgen Structure or ASE Atoms objects
+    cells: dict[str, tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+    for struct_key, struct in structures.items():
+        structure_type = type(struct).__name__
+        if structure_type == "Structure":
+            basis = struct.lattice.matrix
+            positions, numbers = struct.frac_coords, struct.atomic_numbers
+        elif structure_type in ("Atoms", "MSONAtoms"):
+            basis = struct.cell.array
+            positions, numbers = struct.get_scaled_positions(), struct.numbers
+        else:
+            raise ValueError(f"Unsupported {structure_type=}")
+        cell = (np.asarray(basis), np.asarray(positions), np.asarray(numbers))
+        cells[struct_key] = cell
 
-    results: dict[str, dict[str, str | int | list[str]]] = {}
-    iterator = structures.items()
+    parallel = Parallel(n_jobs=n_jobs, return_as="generator")
+    iterator = parallel(
+        delayed(_sym_one)(struct_key, cell, symprec, angle_tolerance)
+        for struct_key, cell in cells.items()
+    )
     if pbar:
         pbar_kwargs = pbar if isinstance(pbar, dict) else {}
         pbar_kwargs.setdefault("desc", "Analyzing symmetry")
-        iterator = tqdm(iterator, total=len(structures), **pbar_kwargs)
+        iterator = tqdm(iterator, total=len(cells), **pbar_kwargs)
+
+    # collect results column-wise to build the DataFrame directly instead of
+    # transposing a dict of per-structure dicts
+    columns: dict[str, list[str | int | float | list[str] | None]] = defaultdict(list)
+    for sym_info in iterator:
+        for key, val in sym_info.items():
+            columns[key].append(val)
+
+    df_sym = pd.DataFrame(columns, index=pd.Index(list(cells), name=Key.mat_id))
+    # spg_num (max 230) and hall_num (max 530) fit in int16 but symmetry op counts
+    # scale with the number of lattice points in the input cell (48 per point for
+    # cubic), so they'd overflow int16 for large supercells
+    int_dtypes = {
+        Key.spg_num: np.int16,
+        Key.hall_num: np.int16,
+        Key.n_sym_ops: np.int32,
+        Key.n_rot_syms: np.int32,
+        Key.n_trans_syms: np.int32,
+    }
+    return df_sym.astype({col: dt for col, dt in int_dtypes.items() if col in df_sym})
+
+
+class PreprocessedStructureMatcher(StructureMatcher):
+    """StructureMatcher that separates the per-structure part of its preprocessing
+    (removing ignored species, Niggli and primitive cell reduction) from pairwise
+    matching. That way reduced structures can be cached and reused across calls,
+    e.g. reference structures compared against many models' predictions.
+    """
 
-    for struct_key, struct in iterator:
-        structure_type = type(struct).__name__
-        adaptor = {
-            "Structure": MoyoAdapter.from_structure,
-            "Atoms": MoyoAdapter.from_atoms,
-            "MSONAtoms": MoyoAdapter.from_atoms,
-        }.get(structure_type)
-        if adaptor is None:
-            raise ValueError(f"Unsupported {structure_type=}")
+    def reduce_structure(self, struct: Structure) -> Structure:
+        """Apply the per-structure steps of StructureMatcher._preprocess.
+
+        Args:
+            struct (Structure): Structure to reduce.
+
+        Returns:
+            Structure: Reduced structure to pass to get_rms_dist_preprocessed.
+        """
+        (struct,) = self._process_species([struct])
+        return self._get_reduced_structure(struct, self._primitive_cell)
+
+    def compositions_match(self, struct1: Structure, struct2: Structure) -> bool:
+        """Cheap pre-screen to run before reduce_structure. Same comparator-hash
+        composition check that StructureMatcher.fit runs before preprocessing (pairs
+        failing it can't match since _match finds no valid site assignment under the
+        species mask), so such pairs can skip the expensive reduction entirely.
+
+        Args:
+            struct1 (Structure): First structure.
+            struct2 (Structure): Second structure.
+
+        Returns:
+            bool: False if the structures can't possibly match, else True.
+        """
+        if self._subset:  # subset matching allows differing compositions
+            return True
+        if self._ignored_species:
+            struct1, struct2 = self._process_species([struct1, struct2])
+        get_hash = self._comparator.get_hash
+        return get_hash(struct1.composition) == get_hash(struct2.composition)
+
+    def get_rms_dist_preprocessed(
+        self, struct1: Structure, struct2: Structure
+    ) -> tuple[float, float] | None:
+        """Same as get_rms_dist but for structures already returned by
+        reduce_structure, so only the pairwise supercell and volume scaling
+        steps of StructureMatcher._preprocess are repeated.
+
+        Args:
+            struct1 (Structure): First reduced structure.
+            struct2 (Structure): Second reduced structure.
+
+        Returns:
+            tuple[float, float] | None: RMSD normalized by (V/atom)^1/3 and max
+                pair distance or None if the structures don't match.
+        """
+        struct1, struct2, fu, s1_supercell = self._preprocess(
+            struct1, struct2, skip_structure_reduction=True
+        )
+        # NOTE: most of _match's time goes into _cart_dists, which has no Kabsch
+        # rotation and already delegates to pymatgen's compiled pbc_shortest_vectors
+        # and LinearAssignment, so there's no pure-NumPy kernel left to JIT here
+        match = self._match(
+            struct1, struct2, fu, s1_supercell, use_rms=True, break_on_match=False
+        )
+        if match is None:
+            return None
+        return match[0], max(match[1])
+
+
+def _reduce_structure(
+    structure_matcher: PreprocessedStructureMatcher, struct_dict: dict[str, Any]
+) -> Structure:
+    """Module-level wrapper around PreprocessedStructureMatcher.reduce_structure so
+    it can be cached with joblib.Memory (which doesn't support bound methods).
+    Takes a structure dict rather than a Structure since pymatgen caches lattice
+    properties in place, so joblib.hash of a Structure isn't stable across calls.
+    """
+    return structure_matcher.reduce_structure(Structure.from_dict(struct_dict))
 
-        moyo_cell = adaptor(struct)
 
-        sym_data = moyopy.MoyoDataset(
-            moyo_cell, symprec=symprec, angle_tolerance=angle_tolerance
-        )
+def _rmsd_one(
+    pred_struct: Structure,
+    ref_struct: Structure,
+    structure_matcher: PreprocessedStructureMatcher,
+    reduce_ref: Callable[..., Structure] | None = None,
+) -> tuple[float, float]:
+    """Get RMSD and max pair distance between a predicted and reference structure.
+    Defined at module level so joblib can pickle it for worker processes.
 
-        if sym_data is None:
-            raise ValueError(
-                f"moyopy symmetry detection returned None for {struct_key}\n{struct}"
-            )
-
-        sym_ops = sym_data.operations
-        hall_symbol_entry = moyopy.HallSymbolEntry(hall_number=sym_data.hall_number)
-
-        sym_info = {
-            Key.spg_num: sym_data.number,
-            Key.hall_num: sym_data.hall_number,
-            MbdKey.international_spg_name: sym_data.site_symmetry_symbols,
-            Key.wyckoff_symbols: sym_data.wyckoffs,
-            Key.n_sym_ops: sym_ops.num_operations,
-            Key.n_rot_syms: len(sym_ops.rotations),
-            Key.n_trans_syms: len(sym_ops.translations),
-            Key.hall_symbol: hall_symbol_entry.hm_short,
-            Key.hall_num: hall_symbol_entry.hall_number,
-        }
-        results[struct_key] = sym_info | dict(
-            symprec=symprec, angle_tolerance=angle_tolerance
-        )
+    Args:
+        pred_struct (Structure): ML-relaxed structure.
+        ref_struct (Structure): Reference structure.
+        structure_matcher (PreprocessedStructureMatcher): Matcher used to compare
+            structures.
+        reduce_ref (Callable, optional): _reduce_structure wrapped in a
+            joblib.Memory cache, used to reduce the reference structure. Defaults to
+            None, meaning reduce it directly without a dict round trip.
 
-    df_sym = pd.DataFrame(results).T
-    df_sym.index.name = Key.mat_id
-    return df_sym
+    Returns:
+        tuple[float, float]: RMSD and max pair distance. Both NaN if the structures
+            don't match.
+    """
+    if reduce_ref is None:
+        reduced_ref = structure_matcher.reduce_structure(ref_struct)
+    else:
+        reduced_ref = reduce_ref(structure_matcher, ref_struct.as_dict())
+    match = structure_matcher.get_rms_dist_preprocessed(
+        structure_matcher.reduce_structure(pred_struct), reduced_ref
+    )
+    return match or (np.nan, np.nan)
 
 
 def pred_vs_ref_struct_symmetry(
@@ -122,11 +298,14 @@ def pred_vs_ref_struct_symmetry(
     ref_structs: dict[str, Structure],
     *,
     pbar: bool | dict[str, str] = True,
+    n_jobs: int = -1,
+    cache_dir: str | None = None,
 ) -> pd.DataFrame:
     """Get RMSD and compare symmetry between ML and DFT reference structures.
 
     Modifies the df_sym_pred DataFrame in place by adding columns for symmetry
-    differences and RMSDs.
+    differences and RMSDs. RMSDs are only calculated for material IDs present in
+    df_sym_pred, pred_structs and ref_structs.
 
     Args:
         df_sym_pred (pd.DataFrame): symmetry information for ML model as returned by
@@ -137,6 +316,14 @@ def pred_vs_ref_struct_symmetry(
         ref_structs (dict[str, Structure]): Map material IDs to reference structures
         pbar (bool | dict[str, str], optional): Whether to show progress bar.
             Defaults to True.
+        n_jobs (int, optional): Number of worker processes passed to joblib.Parallel.
+            Defaults to -1 (all cores). Use 1 to run serially in the current process.
+        cache_dir (str, optional): Directory for joblib.Memory to cache reduced
+            reference structures on disk, keyed by a hash of the structure dict.
+            Speeds up repeated comparisons against the same reference structures
+            (e.g. DFT structures across many models). Predicted structures are
+            never cached since each is only compared once. Defaults to None (no
+            caching).
 
     Returns:
         pd.DataFrame: with added columns for symmetry differences
@@ -149,24 +336,49 @@ def pred_vs_ref_struct_symmetry(
         df_sym_pred[Key.n_sym_ops] - df_sym_ref[Key.n_sym_ops]
     )
 
-    structure_matcher = StructureMatcher()
-    shared_ids = set(pred_structs) & set(ref_structs)
-
-    # Initialize RMSD column
-    df_result[MbdKey.structure_rmsd_vs_dft] = None
-
+    structure_matcher = PreprocessedStructureMatcher()
+    # pairs with different compositions can't match, leave their RMSD as NaN
+    shared_ids = [
+        mat_id
+        for mat_id in set(pred_structs) & set(ref_structs) & set(df_result.index)
+        if structure_matcher.compositions_match(
+            pred_structs[mat_id], ref_structs[mat_id]
+        )
+    ]
+
+    # Initialize RMSD columns as float (not None which would make them object dtype)
+    df_result[MbdKey.structure_rmsd_vs_dft] = np.nan
+    df_result[Key.max_pair_dist] = np.nan
+
+    # reduce structures in the same worker call as the RMSD calculation to avoid
+    # sending reduced structures back and forth between processes
+    reduce_ref = None
+    if cache_dir is not None:
+        reduce_ref = Memory(cache_dir, verbose=0).cache(_reduce_structure)
+    parallel = Parallel(n_jobs=n_jobs, return_as="generator")
+    iterator = parallel(
+        delayed(_rmsd_one)(
+            pred_structs[mat_id], ref_structs[mat_id], structure_matcher, reduce_ref
+        )
+        for mat_id in shared_ids
+    )
     if pbar:
         pbar_kwargs = pbar if isinstance(pbar, dict) else {}
-        shared_ids = tqdm(
-            shared_ids,
+        iterator = tqdm(
+            iterator,
+            total=len(shared_ids),
             **dict(leave=False, desc="Calculating RMSD") | pbar_kwargs,
         )
 
-    for mat_id in shared_ids:
-        rmsd, max_dist = structure_matcher.get_rms_dist(
-            pred_structs[mat_id], ref_structs[mat_id]
-        ) or (None, None)
-        df_result.loc[mat_id, MbdKey.structure_rmsd_vs_dft] = rmsd
-        df_result.loc[mat_id, Key.max_pair_dist] = max_dist
+    # fill positional slots (joblib yields results in input order) and write each
+    # column back with a single .loc assignment
+    rmsds = np.full(len(shared_ids), np.nan)
+    max_dists = np.full(len(shared_ids), np.nan)
+    for idx, (rmsd, max_dist) in enumerate(iterator):
+        rmsds[idx], max_dists[idx] = rmsd, max_dist
+
+    if shared_ids:
+        df_result.loc[shared_ids, MbdKey.structure_rmsd_vs_dft] = rmsds
+        df_result.loc[shared_ids, Key.max_pair_dist] = max_dists
 
     return df_result
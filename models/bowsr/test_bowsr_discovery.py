@@ -1,11 +1,14 @@
 # %%
 import contextlib
+import json
 import os
 from importlib.metadata import version
 from typing import Any
 
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import wandb
 from maml.apps.bowsr.model.megnet import MEGNet
 from maml.apps.bowsr.optimizer import BayesianOptimizer
@@ -23,7 +26,7 @@ __date__ = "2022-08-15"
 
 """
 To slurm submit this file: python path/to/file.py slurm-submit
-Requires MEGNet and MAML installation: pip install megnet maml
+Requires MEGNet, MAML and pyarrow installation: pip install megnet maml pyarrow
 https://github.com/materialsvirtuallab/maml
 """
 
@@ -42,6 +45,38 @@ data_path = {
     Task.IS2RE: DataFiles.wbm_initial_structures.path,
     Task.RS2RE: DataFiles.wbm_computed_structure_entries.path,
 }[task_type]
+input_col = {Task.IS2RE: Key.init_struct, Task.RS2RE: Key.final_struct}[task_type]
+# Parquet copy of data_path with one row group per array task so each task only
+# reads its own rows instead of loading the full multi-GB JSON file
+parquet_path = (
+    f"{data_path.removesuffix('.json.bz2')}-{slurm_array_task_count}-splits.parquet"
+)
+
+
+def get_split_range(n_rows: int, split_idx: int) -> tuple[int, int]:
+    """Start and end row of split_idx in
+    np.array_split(range(n_rows), slurm_array_task_count).
+    """
+    split_size, n_larger_splits = divmod(n_rows, slurm_array_task_count)
+    start = split_idx * split_size + min(split_idx, n_larger_splits)
+    return start, start + split_size + (split_idx < n_larger_splits)
+
+
+# convert once at submission time (before any array task starts). check
+# SLURM_ARRAY_TASK_ID, not SLURM_JOB_ID which is also set in interactive salloc sessions
+if not os.path.isfile(parquet_path) and "SLURM_ARRAY_TASK_ID" not in os.environ:
+    df_in = pd.read_json(data_path).set_index(Key.mat_id)
+    if task_type == Task.RS2RE:
+        df_in[input_col] = [
+            cse["structure"] for cse in df_in[Key.computed_structure_entry]
+        ]
+    # store structures as JSON strings to avoid Arrow inferring nested schemas
+    df_in = df_in[[input_col]].map(json.dumps).reset_index()
+    table = pa.Table.from_pandas(df_in, preserve_index=False)
+    with pq.ParquetWriter(parquet_path, table.schema) as writer:
+        for split_idx in range(slurm_array_task_count):
+            start, end = get_split_range(len(table), split_idx)
+            writer.write_table(table.slice(start, end - start))
 
 
 slurm_vars = slurm_submit(
@@ -69,12 +104,19 @@ if os.path.isfile(out_path):
     raise SystemExit(f"{out_path=} already exists, exciting early")
 
 print(f"\nJob {job_name} started {timestamp}")
-print(f"{data_path = }")
+print(f"{parquet_path = }")
 print(f"{out_path=}")
 
-df_in = pd.read_json(data_path).set_index(Key.mat_id)
-if slurm_array_task_count > 1:
-    df_in = np.array_split(df_in, slurm_array_task_count)[slurm_array_task_id - 1]
+# local debug runs (task ID 0) process the last split
+split_idx = (slurm_array_task_id - 1) % slurm_array_task_count
+parquet_file = pq.ParquetFile(parquet_path)
+# guard against stale files from interrupted writes that would give tasks wrong rows
+if (n_row_groups := parquet_file.num_row_groups) != slurm_array_task_count:
+    raise ValueError(
+        f"{parquet_path=} has {n_row_groups=}, expected {slurm_array_task_count=}. "
+        "Delete it to regenerate."
+    )
+df_in = parquet_file.read_row_group(split_idx).to_pandas().set_index(Key.mat_id)
 
 
 # %%
@@ -106,18 +148,15 @@ wandb.init(project="matbench-discovery", name=job_name, config=run_params)
 
 # %%
 relax_results: dict[str, dict[str, Any]] = {}
-input_col = {Task.IS2RE: Key.init_struct, Task.RS2RE: Key.final_struct}[task_type]
-
-if task_type == Task.RS2RE:
-    df_in[input_col] = [cse["structure"] for cse in df_in[Key.computed_structure_entry]]
-
-structures = df_in[input_col].map(Structure.from_dict).to_dict()
 
-for material_id in tqdm(structures, desc="Relaxing", disable=None):
-    structure = structures[material_id]
+# deserialize structures one at a time inside the loop rather than all up front to
+# keep peak memory low over the hours this loop runs
+pbar = tqdm(df_in[input_col].items(), total=len(df_in), desc="Relaxing", disable=None)
+for material_id, struct_json in pbar:
     if material_id in relax_results:
         continue
     try:
+        structure = Structure.from_dict(json.loads(struct_json))
         optimizer = BayesianOptimizer(
             model=model, structure=structure, **bayes_optim_kwargs
         )
@@ -16,7 +16,7 @@ from pymatgen.core import Structure
 from pymatviz.enums import Key
 
 from matbench_discovery import ROOT
-from matbench_discovery.data import DataFiles, Model
+from matbench_discovery.data import DEFAULT_CACHE_DIR, DataFiles, Model
 from matbench_discovery.metrics import geo_opt
 from matbench_discovery.models import MODEL_METADATA
 from matbench_discovery.structure import analyze_symmetry, pred_vs_ref_struct_symmetry
@@ -132,6 +132,8 @@ for idx, (model_label, model_metadata) in enumerate(MODEL_METADATA.items()):
         model_structs,
         dft_structs,
         pbar=dict(desc=f"{prog_str} Comparing DFT vs {model_label} symmetries"),
+        # DFT structures are the same for every model, only reduce them once
+        cache_dir=f"{DEFAULT_CACHE_DIR}/reduced-structs",
     )
 
     # Save model results
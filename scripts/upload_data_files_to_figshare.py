@@ -2,6 +2,7 @@
 
 import os
 import tomllib
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
 from tqdm import tqdm
@@ -85,32 +86,19 @@ def main(
         # Create lookup dict for faster file checks
         files_by_name = {file["name"]: file for file in existing_files}
 
-        # copy existing_data to preserve all existing entries
-        files_in_article: dict[str, dict[str, str]] = existing_yaml.copy()
-        updated_files: dict[str, str] = {}  # files that were re-uploaded
-        new_files: dict[str, str] = {}  # files that didn't exist before
-
-        pbar = tqdm(DataFiles)
-        for data_file in pbar:
-            pbar.set_description(f"Processing {data_file.name}")
+        # Single pass to skip missing or oversized files and look up each file's
+        # Figshare copy. Copies whose size differs are dropped since that means the
+        # file changed and must be re-uploaded anyway, no need to compare MD5s.
+        local_files: list[tuple[DataFiles, str, dict[str, Any] | None]] = []
+        for data_file in DataFiles:
             file_path = f"{DATA_DIR}/{data_file.rel_path}"
 
             if not os.path.isfile(file_path):
                 print(f"Warning: {file_path} does not exist, skipping...")
                 continue
 
-            # Get existing data or create new entry (make copy to not modify original)
-            file_data = existing_yaml.get(data_file.name, {}).copy()
-
-            # Set defaults for new entries
-            file_data.setdefault("path", data_file.rel_path)
-            file_data.setdefault("description", "Description needed")
-
-            # Check if file needs to be uploaded
             file_name = os.path.basename(file_path)
-            # Use stored MD5 if available, else use newly computed
-            file_hash, file_size = figshare.get_file_hash_and_size(file_path)
-            file_hash = file_data.setdefault("md5", file_hash)
+            file_size = os.path.getsize(file_path)
 
             if file_size > max_file_size:
                 print(
@@ -121,28 +109,96 @@ def main(
                 )
                 continue
 
-            if (
-                existing_file := files_by_name.get(file_name)
-            ) and file_hash == existing_file["computed_md5"]:
-                file_url = f"{figshare.DOWNLOAD_URL_PREFIX}/{existing_file['id']}"
-                file_data["url"] = file_url
-                files_in_article[data_file.name] = file_data
-                continue
+            existing_file = files_by_name.get(file_name)
+            if existing_file and existing_file.get("size") != file_size:
+                existing_file = None
+            local_files.append((data_file, file_path, existing_file))
+
+        # Only files without stored MD5 that have a same-size Figshare copy need
+        # hashing. Hash them concurrently (hashlib releases the GIL while hashing).
+        paths_to_hash = [
+            file_path
+            for data_file, file_path, existing_file in local_files
+            if existing_file and "md5" not in existing_yaml.get(data_file.name, {})
+        ]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            hashes_and_sizes = executor.map(
+                figshare.get_file_hash_and_size, paths_to_hash
+            )
+            file_hashes = {
+                path: md5 for path, (md5, _) in zip(paths_to_hash, hashes_and_sizes)
+            }
 
-            # Upload new or modified file
-            file_id = figshare.upload_file(
-                article_id, file_path, file_name=data_file.rel_path
+        # copy existing_data to preserve all existing entries
+        files_in_article: dict[str, dict[str, str]] = existing_yaml.copy()
+        updated_files: dict[str, str] = {}  # files that were re-uploaded
+        new_files: dict[str, str] = {}  # files that didn't exist before
+        # new or modified files to upload after checking all files (list, not dict
+        # keyed by DataFiles since all members compare equal as str)
+        files_to_upload: list[tuple[DataFiles, dict[str, str]]] = []
+
+        pbar = tqdm(local_files)
+        for data_file, file_path, existing_file in pbar:
+            pbar.set_description(f"Processing {data_file.name}")
+
+            # Get existing data or create new entry (make copy to not modify original)
+            file_data = existing_yaml.get(data_file.name, {}).copy()
+
+            # Set defaults for new entries
+            file_data.setdefault("path", data_file.rel_path)
+            file_data.setdefault("description", "Description needed")
+
+            if existing_file:
+                # Use stored MD5 if available, else use newly computed
+                if "md5" not in file_data:
+                    file_data["md5"] = file_hashes[file_path]
+                if file_data["md5"] == existing_file["computed_md5"]:
+                    file_url = f"{figshare.DOWNLOAD_URL_PREFIX}/{existing_file['id']}"
+                    file_data["url"] = file_url
+                    files_in_article[data_file.name] = file_data
+                    continue
+
+            # queue new or modified file for upload
+            files_to_upload.append((data_file, file_data))
+
+        # Upload queued files concurrently. Uploads are network-bound so threads
+        # suffice. Results are merged sequentially afterwards.
+        def upload(data_file: DataFiles) -> tuple[int, str]:
+            file_path = f"{DATA_DIR}/{data_file.rel_path}"
+            try:
+                # hash once (reusing hash from above if this file was already hashed)
+                # to both upload and record MD5 so unchanged files are skipped next sync
+                if file_path not in file_hashes:
+                    file_hashes[file_path], _ = figshare.get_file_hash_and_size(
+                        file_path
+                    )
+                file_hash = file_hashes[file_path]
+                file_id = figshare.upload_file(
+                    article_id, file_path, file_name=data_file.rel_path, md5=file_hash
+                )
+            except Exception as exc:  # loop variables below don't say which failed
+                exc.add_note(f"Upload failed for {file_path=}")
+                raise
+            return file_id, file_hash
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            uploads = executor.map(
+                upload, [data_file for data_file, _ in files_to_upload]
             )
-            file_url = f"{figshare.DOWNLOAD_URL_PREFIX}/{file_id}"
+            for (data_file, file_data), (file_id, file_hash) in zip(
+                files_to_upload, uploads
+            ):
+                file_url = f"{figshare.DOWNLOAD_URL_PREFIX}/{file_id}"
 
-            file_data["url"] = file_url
-            files_in_article[data_file.name] = file_data
+                file_data["url"] = file_url
+                file_data["md5"] = file_hash
+                files_in_article[data_file.name] = file_data
 
-            # Track whether file is new or updated
-            if data_file.name in existing_yaml:
-                updated_files[data_file.name] = file_url
-            else:
-                new_files[data_file.name] = file_url
+                # Track whether file is new or updated
+                if data_file.name in existing_yaml:
+                    updated_files[data_file.name] = file_url
+                else:
+                    new_files[data_file.name] = file_url
 
         if new_files or updated_files:
             if new_files:
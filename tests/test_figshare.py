@@ -202,6 +202,36 @@ def test_upload_file_to_figshare_variants(
         assert figshare.upload_file(12345, str(test_file), file_name=file_name) == 67890
 
 
+def test_upload_file_with_known_md5(tmp_path: Path) -> None:
+    """Test that passing md5 skips re-hashing the file and is sent to Figshare."""
+    test_file = tmp_path / "upload_test_file"
+    test_file.write_bytes(b"test data")
+    posted: list[dict[str, Any]] = []
+
+    def mock_make_request(method: str, url: str, **kwargs: Any) -> Any:
+        if method == "POST" and "data" in kwargs:
+            posted.append(kwargs["data"])
+            return {"location": "file_location"}
+        if method == "GET" and url == "file_location":
+            return {"id": 67890, "upload_url": "upload_url"}
+        if method == "GET":
+            return {"parts": []}
+        return None
+
+    with (
+        patch(
+            "matbench_discovery.figshare.make_request", side_effect=mock_make_request
+        ),
+        patch("matbench_discovery.figshare.get_file_hash_and_size") as mock_hash,
+    ):
+        file_id = figshare.upload_file(12345, str(test_file), md5="known-md5")
+
+    assert file_id == 67890
+    mock_hash.assert_not_called()
+    assert posted[0]["md5"] == "known-md5"
+    assert posted[0]["size"] == len(b"test data")
+
+
 DUMMY_FILES = [
     {"name": "file1.txt", "id": 1, "md5": "abc123", "size": 100, "status": "ok"},
     {"name": "file2.txt", "id": 2, "md5": "def456", "size": 200, "status": "ok"},
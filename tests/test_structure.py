@@ -1,11 +1,18 @@
+from pathlib import Path
+
+import numpy as np
 import pandas as pd
 import pytest
+from joblib import Memory
+from pymatgen.analysis.structure_matcher import StructureMatcher
 from pymatgen.core import Structure
 from pymatgen.symmetry.analyzer import SpacegroupAnalyzer
 from pymatviz.enums import Key
 
 from matbench_discovery.enums import MbdKey
 from matbench_discovery.structure import (
+    PreprocessedStructureMatcher,
+    _reduce_structure,
     analyze_symmetry,
     perturb_structure,
     pred_vs_ref_struct_symmetry,
@@ -27,6 +34,30 @@ def test_perturb_structure(dummy_struct: Structure, gamma: float) -> None:
     )
 
 
+def test_perturb_structure_keeps_charge_and_labels(dummy_struct: Structure) -> None:
+    struct = Structure(
+        dummy_struct.lattice,
+        dummy_struct.species,
+        dummy_struct.frac_coords,
+        charge=1,
+        labels=["Fe1", "O1"],
+    )
+    perturbed = perturb_structure(struct)
+
+    assert perturbed.charge == struct.charge
+    assert perturbed.labels == struct.labels
+
+
+def test_perturb_structure_random_directions(dummy_struct: Structure) -> None:
+    struct = dummy_struct * (2, 2, 2)
+    perturbed = perturb_structure(struct)
+
+    # sites must not all be shifted along (1, 1, 1) (which in a cubic cell means
+    # equal fractional shifts along all axes)
+    frac_shifts = (perturbed.frac_coords - struct.frac_coords) % 1
+    assert not np.allclose(frac_shifts, frac_shifts[:, :1])
+
+
 @pytest.mark.parametrize(
     "test_structure, expected_spg_num, expected_n_sym_ops",
     [
@@ -58,12 +89,34 @@ def test_analyze_symmetry_multiple_structures(
         "cubic": cubic_struct,
         "tetragonal": tetragonal_struct,
         "monoclinic": monoclinic_struct,
+        # op counts scale with lattice points in the input cell, 96 * 7^3 = 32928
+        # ops would wrap around if stored as int16
+        "supercell": cubic_struct * (7, 7, 7),
     }
     df_sym = analyze_symmetry(structures)
 
-    assert len(df_sym) == 3
-    assert list(df_sym[Key.spg_num]) == [229, 47, 3]
-    assert list(df_sym[Key.n_sym_ops]) == [96, 8, 2]
+    assert len(df_sym) == 4
+    assert df_sym[Key.spg_num].dtype == np.int16
+    assert list(df_sym[Key.spg_num]) == [229, 47, 3, 229]
+    assert list(df_sym[Key.n_sym_ops]) == [96, 8, 2, 32928]
+    assert list(df_sym[Key.n_rot_syms]) == [96, 8, 2, 32928]
+
+
+def test_analyze_symmetry_n_jobs(
+    cubic_struct: Structure,
+    tetragonal_struct: Structure,
+    monoclinic_struct: Structure,
+) -> None:
+    structures = {
+        "cubic": cubic_struct,
+        "tetragonal": tetragonal_struct,
+        "monoclinic": monoclinic_struct,
+    }
+    df_serial = analyze_symmetry(structures, n_jobs=1)
+    df_parallel = analyze_symmetry(structures, n_jobs=2)
+
+    assert list(df_parallel.index) == list(structures)
+    pd.testing.assert_frame_equal(df_serial, df_parallel)
 
 
 def test_pred_vs_ref_struct_symmetry(
@@ -84,6 +137,62 @@ def test_pred_vs_ref_struct_symmetry(
     assert df_compared[MbdKey.n_sym_ops_diff].iloc[0] == n_sym_ops_ml - n_sym_ops_dft
 
 
+def test_pred_vs_ref_struct_symmetry_cache_dir(
+    tmp_path: Path, tetragonal_struct: Structure
+) -> None:
+    key = "structure"
+    pred_struct = tetragonal_struct.copy()
+    pred_struct.translate_sites([1], [0.02, 0, 0])
+    df_ml = analyze_symmetry({key: pred_struct})
+    df_dft = analyze_symmetry({key: tetragonal_struct})
+    args = (df_ml, df_dft, {key: pred_struct}, {key: tetragonal_struct})
+    reduce_cached = Memory(str(tmp_path), verbose=0).cache(_reduce_structure)
+    call_args = (PreprocessedStructureMatcher(), tetragonal_struct.as_dict())
+
+    df_uncached = pred_vs_ref_struct_symmetry(*args, n_jobs=1)
+    assert not reduce_cached.check_call_in_cache(*call_args)
+    df_cached = pred_vs_ref_struct_symmetry(*args, n_jobs=1, cache_dir=str(tmp_path))
+    # only the reference structure is cached, and its hash is stable across calls
+    assert reduce_cached.check_call_in_cache(*call_args)
+    cached_files = sorted(tmp_path.rglob("output.pkl"))
+    assert len(cached_files) == 1
+    mtime = cached_files[0].stat().st_mtime_ns
+    df_from_cache = pred_vs_ref_struct_symmetry(
+        *args, n_jobs=1, cache_dir=str(tmp_path)
+    )
+    assert sorted(tmp_path.rglob("output.pkl")) == cached_files
+    assert cached_files[0].stat().st_mtime_ns == mtime  # cache hit, not rewritten
+
+    assert df_uncached[MbdKey.structure_rmsd_vs_dft].notna().all()
+    pd.testing.assert_frame_equal(df_uncached, df_cached)
+    pd.testing.assert_frame_equal(df_cached, df_from_cache)
+
+
+def test_pred_vs_ref_struct_symmetry_rmsd(tetragonal_struct: Structure) -> None:
+    pred_structs: dict[str, Structure] = {}
+    for idx, shift in enumerate((0.01, 0.03, 0.05)):
+        pred_structs[f"mat-{idx}"] = tetragonal_struct.copy()
+        pred_structs[f"mat-{idx}"].translate_sites([1], [shift, 0, 0])
+    ref_structs = dict.fromkeys(pred_structs, tetragonal_struct)
+    # IDs missing from df_sym_pred are skipped instead of raising KeyError
+    df_ml = analyze_symmetry({key: pred_structs[key] for key in ("mat-0", "mat-1")})
+    df_dft = analyze_symmetry(ref_structs)
+
+    df_compared = pred_vs_ref_struct_symmetry(df_ml, df_dft, pred_structs, ref_structs)
+
+    assert list(df_compared.index) == ["mat-0", "mat-1"]
+    assert df_compared[MbdKey.structure_rmsd_vs_dft].dtype == float
+    for mat_id, row in df_compared.iterrows():
+        rmsd, max_dist = StructureMatcher().get_rms_dist(
+            pred_structs[mat_id], ref_structs[mat_id]
+        )
+        assert row[MbdKey.structure_rmsd_vs_dft] == pytest.approx(rmsd)
+        assert row[Key.max_pair_dist] == pytest.approx(max_dist)
+    # larger shift gives larger RMSD, catches misaligned positional fill
+    rmsds = df_compared[MbdKey.structure_rmsd_vs_dft]
+    assert 0 < rmsds["mat-0"] < rmsds["mat-1"]
+
+
 def test_analyze_symmetry_perturbed_structure(cubic_struct: Structure) -> None:
     perturbed_structure = perturb_structure(cubic_struct, gamma=1.5)
 
@@ -193,8 +302,8 @@ def test_analyze_symmetry_with_ase_atoms(cubic_struct: Structure) -> None:
 
     assert len(df_ase) == 1
     assert df_ase.index.name == Key.mat_id
-    assert isinstance(df_ase[Key.spg_num].iloc[0], int)
-    assert isinstance(df_ase[Key.n_sym_ops].iloc[0], int)
+    assert isinstance(df_ase[Key.spg_num].iloc[0], np.integer)
+    assert isinstance(df_ase[Key.n_sym_ops].iloc[0], np.integer)
 
     # Test mixed dictionary of Structure and Atoms
     df_mixed = analyze_symmetry({"pmg": cubic_struct, "ase": atoms})
@@ -213,3 +322,35 @@ def test_analyze_symmetry_with_ase_atoms(cubic_struct: Structure) -> None:
     df_struct.index = df_atoms.index
 
     pd.testing.assert_frame_equal(df_struct, df_atoms)
+
+
+def test_preprocessed_structure_matcher(cubic_struct: Structure) -> None:
+    perturbed = cubic_struct.copy()
+    perturbed.perturb(distance=0.05)
+    matcher = PreprocessedStructureMatcher()
+
+    rms_dist = matcher.get_rms_dist(perturbed, cubic_struct)
+    assert rms_dist is not None
+    rms_dist_preprocessed = matcher.get_rms_dist_preprocessed(
+        matcher.reduce_structure(perturbed), matcher.reduce_structure(cubic_struct)
+    )
+    assert rms_dist_preprocessed == pytest.approx(rms_dist)
+
+
+def test_preprocessed_structure_matcher_compositions_match(
+    cubic_struct: Structure, tetragonal_struct: Structure
+) -> None:
+    matcher = PreprocessedStructureMatcher()
+    assert matcher.compositions_match(cubic_struct, cubic_struct * (2, 1, 1))
+    assert not matcher.compositions_match(cubic_struct, tetragonal_struct)
+
+    # different compositions are skipped before RMSD calculation
+    key = "structure"
+    df_compared = pred_vs_ref_struct_symmetry(
+        analyze_symmetry({key: cubic_struct}),
+        analyze_symmetry({key: tetragonal_struct}),
+        {key: cubic_struct},
+        {key: tetragonal_struct},
+    )
+    assert df_compared[MbdKey.structure_rmsd_vs_dft].isna().all()
+    assert df_compared[Key.max_pair_dist].isna().all()